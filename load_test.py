@@ -0,0 +1,159 @@
+import argparse
+import math
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+# Offline load test for streamlit_app.py.
+#
+# Every worker process plays the role of one app replica: its sessions share the
+# same st.cache_data / st.cache_resource, like the sessions of a real Streamlit server.
+#
+# Example:
+#   python load_test.py --dataset dataset.csv --processes 2 --sessions 8 --iterations 5
+
+app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+
+def timed_run(at, latencies, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    latencies.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+# Widgets every session interacts with; a missing one fails the run instead of silently
+# measuring first loads only
+raw_data_label = 'Show raw data'
+threshold_label = 'Threshold (minutes)'
+
+
+def find_widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise RuntimeError(f"Widget '{label}' not found on the page, the interactions cannot be simulated")
+
+
+# One simulated visitor: first load, then a few rounds of realistic interactions.
+# First-load and interaction rerun latencies are returned separately.
+def run_session(iterations, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    first_load = []
+    reruns = []
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    timed_run(at, first_load, timeout)
+
+    for _ in range(iterations):
+        # Toggle "Show raw data" on and off (widgets are looked up again after each rerun)
+        for checked in (True, False):
+            find_widget(at.checkbox, raw_data_label).set_value(checked)
+            timed_run(at, reruns, timeout)
+        # Go through every threshold offered by the page
+        for option in find_widget(at.select_slider, threshold_label).options:
+            find_widget(at.select_slider, threshold_label).set_value(option)
+            timed_run(at, reruns, timeout)
+    return first_load, reruns
+
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 1024 ** 2
+
+
+def run_replica(dataset, sessions, iterations, timeout):
+    # The app reads its dataset path and snapshot directory at import time (see report.py).
+    # Every replica gets an empty snapshot directory, so each run measures the snapshot build
+    # and never reuses a stale snapshot from an earlier run.
+    os.environ['GETAROUND_DATASET'] = dataset
+    snapshot_dir = tempfile.TemporaryDirectory(prefix='getaround-snapshot-')
+    os.environ['GETAROUND_SNAPSHOT_DIR'] = snapshot_dir.name
+
+    # Sample RSS while the sessions run
+    rss_samples = []
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.is_set():
+            rss_samples.append(current_rss_mb())
+            done.wait(0.1)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda _: run_session(iterations, timeout), range(sessions)))
+    done.set()
+    sampler.join()
+    snapshot_dir.cleanup()
+
+    return {
+        'pid': os.getpid(),
+        'first_load': [latency for first_load, _ in results for latency in first_load],
+        'reruns': [latency for _, reruns in results for latency in reruns],
+        'rss_mean_mb': statistics.fmean(rss_samples) if rss_samples else current_rss_mb(),
+        # ru_maxrss is in kilobytes on Linux
+        'rss_peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# Nearest-rank percentile
+def percentile(values, q):
+    values = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent-session load test for streamlit_app.py')
+    parser.add_argument('--dataset', required=True, help='local dataset file (.xlsx or .csv)')
+    parser.add_argument('--processes', type=int, default=1, help='number of app replicas (worker processes)')
+    parser.add_argument('--sessions', type=int, default=4, help='concurrent sessions per replica')
+    parser.add_argument('--iterations', type=int, default=3, help='interaction rounds per session after the first load (at least 1)')
+    parser.add_argument('--timeout', type=float, default=120, help='timeout of a single rerun, in seconds')
+    parser.add_argument('--max-p95', type=float, help='exit with status 1 if the p95 interaction rerun latency (ms) is above this value')
+    args = parser.parse_args(argv)
+
+    if args.iterations < 1:
+        parser.error('--iterations must be at least 1')
+
+    dataset = os.path.abspath(args.dataset)
+    if not os.path.exists(dataset):
+        parser.error(f'dataset not found: {dataset}')
+
+    start = time.perf_counter()
+    # "spawn" gives every replica its own fresh Streamlit caches
+    with ProcessPoolExecutor(max_workers=args.processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(run_replica, dataset, args.sessions, args.iterations, args.timeout)
+                   for _ in range(args.processes)]
+        replicas = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    first_load = [latency * 1000 for replica in replicas for latency in replica['first_load']]
+    latencies = [latency * 1000 for replica in replicas for latency in replica['reruns']]
+    p50, p95, p99 = (percentile(latencies, q) for q in (50, 95, 99))
+
+    print(f"Sessions: {args.processes * args.sessions} ({args.processes} process(es) x {args.sessions})")
+    print(f"Reruns: {len(first_load) + len(latencies)} in {elapsed:.2f}s")
+    print(f"Throughput: {(len(first_load) + len(latencies)) / elapsed:.2f} reruns/s")
+    print(f"First load latency (includes the snapshot build): p50 {percentile(first_load, 50):.1f} ms, max {max(first_load):.1f} ms")
+    print(f"Interaction rerun latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, max {max(latencies):.1f} ms")
+    for replica in replicas:
+        print(f"Process {replica['pid']}: RSS mean {replica['rss_mean_mb']:.1f} MB, peak {replica['rss_peak_mb']:.1f} MB")
+
+    if args.max_p95 is not None and p95 > args.max_p95:
+        print(f"p95 latency {p95:.1f} ms is above the limit of {args.max_p95:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
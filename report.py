@@ -0,0 +1,654 @@
+import hashlib
+import html
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+import plotly.io as pio
+
+# GETAROUND_DATASET points the app at a local copy of the dataset (offline runs, load tests)
+data_path = os.environ.get('GETAROUND_DATASET', 'https://projet-deploiement-jedha.s3.eu-west-3.amazonaws.com/dataset_streamlit_app.xlsx')
+
+# Pre-rendered snapshots live in one sub-directory per dataset fingerprint
+# (GETAROUND_SNAPSHOT_DIR moves them elsewhere, e.g. a fresh directory per load test run)
+snapshot_root = os.environ.get('GETAROUND_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshot'))
+
+time_intervals = [30, 60, 120, 240, 600, 720]
+
+# Bump when the validation rules or the report computations change, so existing snapshots are rebuilt
+snapshot_version = 7
+
+# Expected schema of the dataset
+numeric_columns = ['rental_id', 'car_id', 'delay_at_checkout_in_minutes',
+                   'previous_ended_rental_id', 'time_delta_with_previous_rental_in_minutes']
+required_columns = numeric_columns + ['checkin_type', 'state']
+checkin_types = ['mobile', 'connect']
+rental_states = ['ended', 'canceled']
+# The dataset only records the previous rental when it ended less than 12 hours before
+max_time_delta = 720
+
+
+def load_dataset(path=data_path):
+    if str(path).endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+# Fingerprint of the dataset content: the snapshot is rebuilt only when this changes
+def dataset_fingerprint(df):
+    digest = hashlib.sha256()
+    digest.update(str(snapshot_version).encode())
+    digest.update(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+# Validation stage, run once per dataset version (the result is cached with the dataset).
+# Every check is a vectorized column check; rows failing any of them are moved to a
+# quarantine table with the reasons, and the validated frame gets a fresh RangeIndex.
+def validate_dataset(df):
+    missing = [column for column in required_columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Dataset is missing required columns: {', '.join(missing)}")
+
+    df = df.reset_index(drop=True)
+    checked = df.copy()
+    for column in numeric_columns:
+        checked[column] = pd.to_numeric(df[column], errors='coerce')
+
+    time_delta = checked['time_delta_with_previous_rental_in_minutes']
+    previous_id = checked['previous_ended_rental_id']
+
+    checks = {
+        'non-numeric value': (checked[numeric_columns].isna() & df[numeric_columns].notna()).any(axis=1),
+        'missing rental_id': checked['rental_id'].isna(),
+        # There is no telling which copy is right, so all of them are quarantined
+        'duplicate rental_id': checked['rental_id'].notna() & checked['rental_id'].duplicated(keep=False),
+        'unknown checkin_type': ~df['checkin_type'].isin(checkin_types),
+        'unknown state': ~df['state'].isin(rental_states),
+        'time delta out of range': time_delta.notna() & ((time_delta < 0) | (time_delta > max_time_delta)),
+        # A time delta is only recorded together with the previous rental, and vice versa
+        'time delta without previous rental': time_delta.notna() & previous_id.isna(),
+        'previous rental without time delta': previous_id.notna() & time_delta.isna(),
+        'dangling previous_ended_rental_id': previous_id.notna() & ~previous_id.isin(checked['rental_id']),
+    }
+
+    failed = pd.DataFrame(checks)
+    bad_rows = failed.any(axis=1)
+
+    if bad_rows.all():
+        reasons = failed.sum()
+        reasons = '; '.join(f'{reason}: {count}' for reason, count in reasons[reasons > 0].items())
+        raise ValueError(f"No rows passed the data validation ({df.shape[0]} rows rejected): {reasons}")
+
+    quarantine = df[bad_rows].copy()
+    quarantine['reason'] = failed[bad_rows].dot(failed.columns + '; ').str.rstrip('; ')
+
+    # Rows whose previous rental was quarantined are kept, only the link is removed: their
+    # time delta is still valid, the preceding checkout delay is just unknown
+    valid = checked[~bad_rows].copy()
+    unlinked = valid['previous_ended_rental_id'].notna() & ~valid['previous_ended_rental_id'].isin(valid['rental_id'])
+    valid.loc[unlinked, 'previous_ended_rental_id'] = float('nan')
+
+    return valid.reset_index(drop=True), quarantine
+
+
+# Single vectorized pass over the rentals: every row gets its grouping keys (scope, time delta
+# interval, preceding checkout delay, checkout status, canceled flag) and the frame is aggregated once.
+# All the interval and cancellation metrics are then read from this small table.
+def scan_rentals(df, time_intervals):
+    time_delta = df['time_delta_with_previous_rental_in_minutes']
+    # Checkout delay of the preceding rental (rental_id is unique after validation)
+    previous_delay = df['previous_ended_rental_id'].map(df.set_index('rental_id')['delay_at_checkout_in_minutes'])
+
+    keys = pd.DataFrame({
+        'checkin_type': df['checkin_type'],
+        # Upper bound of the time delta interval; NaN when there is no previous rental within
+        # 12 hours (NaN time delta) or when both rentals are back to back (time delta of 0)
+        'delta_interval': pd.cut(time_delta, bins=[0] + time_intervals, labels=time_intervals),
+        # Same intervals for the cancellation breakdown, with back-to-back rentals in their own '0' bucket
+        'gap_interval': pd.cut(time_delta, bins=[float('-inf'), 0] + time_intervals, labels=gap_labels(time_intervals)),
+        'preceding_delay': pd.cut(previous_delay, bins=[float('-inf'), 0] + time_intervals + [float('inf')],
+                                  labels=preceding_delay_labels(time_intervals)),
+        # NaN when the checkout delay is missing (canceled rentals)
+        'checkout': pd.cut(df['delay_at_checkout_in_minutes'], bins=[float('-inf'), 0, float('inf')],
+                           labels=['on time', 'late']),
+        'canceled': df['state'] == 'canceled',
+        # The previous driver was still out when this rental was due to start
+        'blocked': previous_delay > time_delta,
+    })
+    scan = keys.groupby(list(keys.columns), observed=True, dropna=False).size()
+    return scan.rename('count').reset_index()
+
+
+def preceding_delay_labels(time_intervals):
+    bounds = [0] + time_intervals
+    return (['on time'] + [f'{low}-{high}' for low, high in zip(bounds, bounds[1:])]
+            + [f'> {time_intervals[-1]}'])
+
+
+def gap_labels(time_intervals):
+    bounds = [0] + time_intervals
+    return ['0'] + [f'{low}-{high}' for low, high in zip(bounds, bounds[1:])]
+
+
+def cancellation_rates(counts):
+    totals = counts.sum(axis=1)
+    return [float(rate) for rate in (100 * counts[True] / totals.where(totals > 0)).fillna(0)]
+
+
+# Per-interval figures for one scope, read from the aggregated scan
+def scope_metrics(scan, time_intervals):
+    total = int(scan['count'].sum())
+    ended = ~scan['canceled']
+    late = scan['checkout'] == 'late'
+    preceded = scan[scan['delta_interval'].notna()]
+
+    # Problematic cases (late checkout + planned next rental) within each time interval
+    problematic = preceded[preceded['checkout'] == 'late'].groupby('delta_interval', observed=False)['count'].sum()
+    counts = problematic.reindex(time_intervals, fill_value=0).cumsum()
+
+    # Cancellation rate of the rentals falling in each time delta interval (back-to-back included)
+    gaps = gap_labels(time_intervals)
+    by_delta = scan.groupby(['gap_interval', 'canceled'], observed=False)['count'].sum().unstack(fill_value=0)
+    by_delta = by_delta.reindex(index=gaps, columns=[False, True], fill_value=0)
+
+    # Cancellation rate by the checkout delay of the preceding rental
+    labels = preceding_delay_labels(time_intervals)
+    by_delay = scan.groupby(['preceding_delay', 'canceled'], observed=False)['count'].sum().unstack(fill_value=0)
+    by_delay = by_delay.reindex(index=labels, columns=[False, True], fill_value=0)
+
+    # A threshold T would plausibly have prevented the cancellations where the previous
+    # driver was still out at check-in but returned less than T minutes late
+    blocked_canceled = scan[scan['blocked'] & scan['canceled']]
+    prevented = blocked_canceled.groupby('preceding_delay', observed=False)['count'].sum()
+    prevented = prevented.reindex(labels, fill_value=0).iloc[1:len(time_intervals) + 1].cumsum()
+
+    return {
+        'total': total,
+        'late': int(scan.loc[late, 'count'].sum()),
+        'on_time': int(scan.loc[scan['checkout'] == 'on time', 'count'].sum()),
+        # Canceled rentals have no checkout, the shares over ended rentals leave them out
+        'ended': int(scan.loc[ended, 'count'].sum()),
+        'late_ended': int(scan.loc[late & ended, 'count'].sum()),
+        'on_time_ended': int(scan.loc[(scan['checkout'] == 'on time') & ended, 'count'].sum()),
+        'problematic_ended': int(preceded.loc[(preceded['checkout'] == 'late') & ~preceded['canceled'], 'count'].sum()),
+        'counts': [int(count) for count in counts],
+        'canceled': int(scan.loc[scan['canceled'], 'count'].sum()),
+        'cancellation_rate': 100 * int(scan.loc[scan['canceled'], 'count'].sum()) / total if total else 0.0,
+        'cancellation_rate_by_delta': cancellation_rates(by_delta),
+        'cancellation_rate_by_preceding_delay': cancellation_rates(by_delay),
+        'cancellations_blocked': int(blocked_canceled['count'].sum()),
+        'cancellations_prevented': [int(count) for count in prevented],
+    }
+
+
+def compute_metrics(df, quarantine=None):
+    total_rentals = df.shape[0]
+    time_delta = df['time_delta_with_previous_rental_in_minutes']
+    has_previous_rental = time_delta.notna()
+
+    # Time delta between rentals (quartile distribution)
+    df_late_checkin = df[has_previous_rental & (time_delta > 0)]
+    time_delta_stats = df_late_checkin['time_delta_with_previous_rental_in_minutes'].describe()
+
+    # Rentals preceded by another rental within 12 hours (the time delta is recorded even when
+    # the link to a quarantined previous rental was removed by the validation)
+    num_rentals_concerned = has_previous_rental.sum()
+    percentage_rentals_affected = 100 * num_rentals_concerned / total_rentals
+
+    # Problematic cases and cancellations per time interval, for all cars and per check-in type
+    scan = scan_rentals(df, time_intervals)
+    scopes = {
+        'all': scope_metrics(scan, time_intervals),
+        'connect': scope_metrics(scan[scan['checkin_type'] == 'connect'], time_intervals),
+        'mobile': scope_metrics(scan[scan['checkin_type'] == 'mobile'], time_intervals),
+    }
+
+    # Drivers on time vs drivers late for check-out, over all rentals and over ended rentals only
+    all_cars = scopes['all']
+    drivers_on_time = 100 * all_cars['on_time'] / total_rentals
+    percentage_drivers_late = 100 * all_cars['late'] / total_rentals
+    ended_rentals = all_cars['ended']
+    drivers_on_time_ended = 100 * all_cars['on_time_ended'] / ended_rentals if ended_rentals else 0.0
+    percentage_drivers_late_ended = 100 * all_cars['late_ended'] / ended_rentals if ended_rentals else 0.0
+
+    # Problematic cases: time deltas never exceed 720 minutes, the last interval covers them all
+    prob_cases = all_cars['counts'][-1]
+    percentage_prob_cases = (100 * prob_cases) / total_rentals
+    percentage_prob_cases_ended = 100 * all_cars['problematic_ended'] / ended_rentals if ended_rentals else 0.0
+
+    # The 720 minutes interval covers the longest delay measured
+    within_720 = {}
+    for scope in ('connect', 'mobile'):
+        count = [scopes[scope]['counts'][-1]]
+        within_720[scope] = {
+            'over_problematic': percentages(count, prob_cases)[0],
+            'over_total': percentages(count, total_rentals)[0],
+        }
+
+    checkin_counts = scan.groupby('checkin_type')['count'].sum().sort_values(ascending=False)
+    checkin_percentages = (checkin_counts / checkin_counts.sum()) * 100
+
+    return {
+        'total_rentals': int(total_rentals),
+        'drivers_on_time': float(drivers_on_time),
+        'percentage_drivers_late': float(percentage_drivers_late),
+        'ended_rentals': int(ended_rentals),
+        'drivers_on_time_ended': float(drivers_on_time_ended),
+        'percentage_drivers_late_ended': float(percentage_drivers_late_ended),
+        'percentage_prob_cases_ended': float(percentage_prob_cases_ended),
+        'time_delta_stats': {key: float(value) for key, value in time_delta_stats.items()},
+        'num_rentals_concerned': int(num_rentals_concerned),
+        'percentage_rentals_affected': float(percentage_rentals_affected),
+        'prob_cases': int(prob_cases),
+        'percentage_prob_cases': float(percentage_prob_cases),
+        'time_intervals': time_intervals,
+        'preceding_delay_labels': preceding_delay_labels(time_intervals),
+        'total_connect': scopes['connect']['total'],
+        'total_mobile': scopes['mobile']['total'],
+        'counts_all': scopes['all']['counts'],
+        'counts_connect': scopes['connect']['counts'],
+        'counts_mobile': scopes['mobile']['counts'],
+        'scopes': scopes,
+        'within_720': within_720,
+        'checkin_percentages': {str(key): float(value) for key, value in checkin_percentages.items()},
+        'quarantined_rows': 0 if quarantine is None else int(quarantine.shape[0]),
+    }
+
+
+def percentages(counts, total):
+    return [100 * count / total if total else 0.0 for count in counts]
+
+
+def build_figures(df, metrics):
+    figures = {}
+    time_intervals = metrics['time_intervals']
+
+    ## Simple bar chart
+    labels = ['Drivers Late', 'Drivers On Time']
+    values = [metrics['percentage_drivers_late'], metrics['drivers_on_time']]
+
+    fig = go.Figure(
+        go.Bar(
+            x=labels,
+            y=values,
+            marker_color=['skyblue', 'lightcoral'],  # Colors for the bars
+            text=[f'{val:.2f}%' for val in values],  # Add percentage text to the bars
+            textposition='auto'  # Position text automatically
+        )
+    )
+    fig.update_layout(
+        title='Percentage of Rentals Concerned and Drivers Status',
+        yaxis_title='Percentage (%)',
+        yaxis_range=[0, 100]  # Set y-axis range from 0 to 100
+    )
+    figures['late_vs_on_time'] = fig
+
+    # Box plot of the 'time_delta_with_previous_rental_in_minutes' column
+    df_late_checkin = df[df['time_delta_with_previous_rental_in_minutes'] > 0]
+    fig = px.box(df_late_checkin, y="time_delta_with_previous_rental_in_minutes",
+                title="Time Delta Between Rentals (quartile distribution)",
+                color_discrete_sequence=["#636EFA"])
+    fig.update_layout(
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font_color="white",
+        title_x=0.5,             # Center the title
+        xaxis_title="Rentals",
+        yaxis_title="Time Delta (in minutes)",
+        xaxis=dict(
+            showgrid=True,
+            zeroline=False,
+            tickfont=dict(color="white"),
+            title_font=dict(color="white")
+        ),
+        yaxis=dict(
+            showgrid=True,
+            zeroline=False,
+            tickfont=dict(color="white"),
+            title_font=dict(color="white"),
+        ),
+    )
+    figures['time_delta_box'] = fig
+
+    # Donut-like pie charts (gauge style)
+    percentage_rentals_affected = metrics['percentage_rentals_affected']
+    gauge_fig = px.pie(
+        names=["Affected Rentals", "Unaffected Rentals"],
+        values=[percentage_rentals_affected, 100 - percentage_rentals_affected],
+        title="Percentage of Rentals Affected",
+        hole=0.7
+    )
+    figures['rentals_affected'] = gauge_fig
+
+    percentage_prob_cases = metrics['percentage_prob_cases']
+    gauge_fig = px.pie(
+        names=["Problematic Cases", "Non-Problematic Cases"],
+        values=[percentage_prob_cases, 100 - percentage_prob_cases],
+        title="Percentage of Problematic Cases",
+        hole=0.7  # Makes it a donut (gauge-like)
+    )
+    figures['problematic_cases'] = gauge_fig
+
+    for name in ('rentals_affected', 'problematic_cases'):
+        figures[name].update_traces(
+            textinfo="label+percent",  # show labels and percentages
+            textfont_size=12,
+        )
+        figures[name].update_layout(
+            plot_bgcolor="black",
+            paper_bgcolor="black",
+            font_color="white",
+            title_x=0.5  # Centers the title
+        )
+
+    # Percentages over the problematic cases and over the total of rentals
+    prob_cases = metrics['prob_cases']
+    percentages_connect = percentages(metrics['counts_connect'], prob_cases)
+    percentages_mobile = percentages(metrics['counts_mobile'], prob_cases)
+    percentages_within_intervals = percentages(metrics['counts_all'], prob_cases)
+    percentages_over_total = percentages(metrics['counts_all'], metrics['total_rentals'])
+    percentages_connect_over_total = percentages(metrics['counts_connect'], metrics['total_connect'])
+    percentages_mobile_over_total = percentages(metrics['counts_mobile'], metrics['total_mobile'])
+
+    # Connect vs mobile, labelled by interval range
+    interval_labels = [f'0-{interval}' for interval in time_intervals]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=interval_labels,
+        y=percentages_connect,
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=interval_labels,
+        y=percentages_mobile,
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Percentage over total of problematic cases for the different time intervals',
+        xaxis_title='Time Interval (minutes)',
+        yaxis_title='Percentage (%)',
+        barmode='group',  # Group the bars
+        xaxis=dict(tickmode='array', tickvals=interval_labels),
+        yaxis=dict(range=[0, max(max(percentages_connect), max(percentages_mobile)) + 10])
+    )
+    figures['scope_intervals'] = fig
+
+    # All type of cars
+    fig1 = go.Figure()
+    fig1.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_within_intervals,
+        name='Percentage of Problematic Cases Within Intervals',
+        marker_color='royalblue'
+    ))
+    fig1.update_layout(
+        title='Percentage of Problematic Cases Within Different Time Intervals',
+        xaxis_title='Time Interval (minutes)',
+        yaxis_title='Percentage',
+        xaxis=dict(tickmode='array', tickvals=time_intervals, ticktext=[f'{i} min' for i in time_intervals])
+    )
+    figures['intervals_over_problematic'] = fig1
+
+    fig2 = go.Figure()
+    fig2.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_over_total,
+        name='Percentage of Problematic Cases Over Total Rentals',
+        marker_color='lightcoral'
+    ))
+    fig2.update_layout(
+        title='Percentage of Problematic Cases Over Total Rentals',
+        xaxis_title='Time Interval (minutes)',
+        yaxis_title='Percentage',
+        xaxis=dict(tickmode='array', tickvals=time_intervals, ticktext=[f'{i} min' for i in time_intervals])
+    )
+    figures['intervals_over_total'] = fig2
+
+    # Check-in types distribution
+    labels = list(metrics['checkin_percentages'].keys())
+    values = list(metrics['checkin_percentages'].values())
+    fig = go.Figure(
+        go.Bar(
+            x=labels,
+            y=values,
+            marker_color=['skyblue', 'lightcoral'],
+            text=[f'{val:.2f}%' for val in values],
+            textposition='auto'
+        )
+    )
+    fig.update_layout(
+        title='Check-in types distribution',
+        yaxis_title='Percentage of Check-ins',
+        xaxis_title='Check-in Type',
+        yaxis=dict(
+            range=[0, max(values) + 10]
+    ))
+    figures['checkin_types'] = fig
+
+    # Connect check-in cars vs Mobile check-in cars
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_connect,
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_mobile,
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Percentage over problematic cases for the different time intervals',
+        xaxis_title='Time Interval (minutes)',
+        yaxis_title='Percentage (%)',
+        barmode='group',  # Group the bars
+        xaxis=dict(tickmode='array', tickvals=time_intervals),
+        yaxis=dict(range=[0, max(max(percentages_connect), max(percentages_mobile_over_total)) + 10])
+    )
+    figures['scope_over_problematic'] = fig
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_connect_over_total,
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=percentages_mobile_over_total,
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Percentage over total rented cars for the different time intervals',
+        xaxis_title='Time Interval (minutes)',
+        yaxis_title='Percentage (%)',
+        barmode='group',  # Group the bars
+        xaxis=dict(tickmode='array', tickvals=time_intervals),
+    )
+    figures['scope_over_total'] = fig
+
+    # Cancellations
+    scopes = metrics['scopes']
+    delay_labels = metrics['preceding_delay_labels']
+    # Time delta intervals, this time not cumulative, with back-to-back rentals in the '0' bucket
+    interval_labels = gap_labels(time_intervals)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=interval_labels,
+        y=scopes['connect']['cancellation_rate_by_delta'],
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=interval_labels,
+        y=scopes['mobile']['cancellation_rate_by_delta'],
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Cancellation rate by time delta with the previous rental',
+        xaxis_title='Time Delta (minutes)',
+        yaxis_title='Cancellation rate (%)',
+        barmode='group',
+    )
+    figures['cancellation_by_delta'] = fig
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=delay_labels,
+        y=scopes['connect']['cancellation_rate_by_preceding_delay'],
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=delay_labels,
+        y=scopes['mobile']['cancellation_rate_by_preceding_delay'],
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Cancellation rate by checkout delay of the preceding rental',
+        xaxis_title='Checkout delay of the preceding rental (minutes)',
+        yaxis_title='Cancellation rate (%)',
+        barmode='group',
+    )
+    figures['cancellation_by_preceding_delay'] = fig
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=scopes['connect']['cancellations_prevented'],
+        name='Connect Check-in',
+        marker_color='lightcoral'
+    ))
+    fig.add_trace(go.Bar(
+        x=time_intervals,
+        y=scopes['mobile']['cancellations_prevented'],
+        name='Mobile Check-in',
+        marker_color='royalblue'
+    ))
+    fig.update_layout(
+        title='Cancellations plausibly prevented by each threshold',
+        xaxis_title='Threshold (minutes)',
+        yaxis_title='Cancellations',
+        barmode='stack',
+        xaxis=dict(tickmode='array', tickvals=time_intervals, ticktext=[f'{i} min' for i in time_intervals])
+    )
+    figures['cancellations_prevented'] = fig
+
+    return figures
+
+
+# Computed text of the report, shared by the Streamlit page and the static HTML bundle
+def summary_lines(metrics):
+    prob_cases = metrics['prob_cases']
+    total_rentals = metrics['total_rentals']
+    within_720 = metrics['within_720']
+    return [
+        f"Percentage of drivers who returned their car on time or before the scheduled time: {metrics['drivers_on_time']:.2f}%",
+        f"Percentage of drivers late for check-out: {metrics['percentage_drivers_late']:.2f}%",
+        f"Over ended rentals only ({metrics['ended_rentals']}): {metrics['drivers_on_time_ended']:.2f}% on time, {metrics['percentage_drivers_late_ended']:.2f}% late",
+        f"Total Rentals: {total_rentals}",
+        f"Rentals Affected: {metrics['num_rentals_concerned']}",
+        f"Percentage of Rentals Affected: {metrics['percentage_rentals_affected']:.2f}%",
+        f"Rows set aside by the validation stage: {metrics['quarantined_rows']}",
+        f"It would resolve {prob_cases} problematic cases.",
+        f"This means {metrics['percentage_prob_cases']:.2f}% of cases over the total number of rentals.",
+        f"Over ended rentals only, {metrics['percentage_prob_cases_ended']:.2f}% of the rentals are problematic cases.",
+        f"- Percentage of problematic connect cases within 720 minutes: {within_720['connect']['over_problematic']:.2f}%",
+        f"- Percentage of problematic connect cases within 720 minutes over the total of rentals: {within_720['connect']['over_total']:.2f}%",
+        f"- Percentage of problematic mobile cases within 720 minutes: {within_720['mobile']['over_problematic']:.2f}%",
+        f"- Percentage of problematic mobile cases within 720 minutes over the total of rentals: {within_720['mobile']['over_total']:.2f}%",
+        f"Cancellation rate: {metrics['scopes']['all']['cancellation_rate']:.2f}%",
+        f"Cancellations where the previous driver was still out at check-in: {metrics['scopes']['all']['cancellations_blocked']}",
+    ]
+
+
+def render_html(metrics, figures):
+    parts = ['<!DOCTYPE html>', '<html>', '<head>', '<meta charset="utf-8">',
+             '<title>Get around case study</title>', '</head>', '<body>',
+             '<h1>Get around case study</h1>', '<ul>']
+    parts += [f'<li>{html.escape(line)}</li>' for line in summary_lines(metrics)]
+    parts.append('</ul>')
+    # plotly.js is embedded once, with the first figure, so the file is self-contained
+    for i, fig in enumerate(figures.values()):
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=(i == 0)))
+    parts += ['</body>', '</html>']
+    return '\n'.join(parts)
+
+
+def build_snapshot(df, fingerprint, root=snapshot_root, quarantine=None):
+    metrics = compute_metrics(df, quarantine)
+    figures = build_figures(df, metrics)
+    return write_snapshot(metrics, figures, fingerprint, root, quarantine)
+
+
+def write_snapshot(metrics, figures, fingerprint, root=snapshot_root, quarantine=None):
+    os.makedirs(root, exist_ok=True)
+    # Write into a temporary directory first so a concurrent reader never sees a half-built snapshot
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{fingerprint}-', dir=root)
+    try:
+        for name, fig in figures.items():
+            fig.write_json(os.path.join(tmp_dir, f'{name}.json'))
+        with open(os.path.join(tmp_dir, 'report.html'), 'w', encoding='utf-8') as f:
+            f.write(render_html(metrics, figures))
+        if quarantine is not None:
+            quarantine.to_csv(os.path.join(tmp_dir, 'quarantine.csv'), index=False)
+        with open(os.path.join(tmp_dir, 'snapshot.json'), 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'figures': list(figures), 'metrics': metrics}, f, indent=2)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    target = os.path.join(root, fingerprint)
+    try:
+        os.rename(tmp_dir, target)
+    except OSError:
+        # Another process already published the same snapshot
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return target
+
+
+def load_snapshot(fingerprint, root=snapshot_root):
+    snapshot_dir = os.path.join(root, fingerprint)
+    with open(os.path.join(snapshot_dir, 'snapshot.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    figures = {name: pio.read_json(os.path.join(snapshot_dir, f'{name}.json')) for name in manifest['figures']}
+    return manifest['metrics'], figures
+
+
+def load_or_build_snapshot(df, fingerprint, root=snapshot_root, quarantine=None):
+    if os.path.exists(os.path.join(root, fingerprint, 'snapshot.json')):
+        return load_snapshot(fingerprint, root)
+
+    metrics = compute_metrics(df, quarantine)
+    figures = build_figures(df, metrics)
+    try:
+        write_snapshot(metrics, figures, fingerprint, root, quarantine)
+    except OSError:
+        # Read-only deploy: serve the report from memory (the caller still caches it per process)
+        return metrics, figures
+    return load_snapshot(fingerprint, root)
+
+
+if __name__ == '__main__':
+    # python report.py [dataset path]: pre-render the snapshot, e.g. before a traffic peak
+    path = sys.argv[1] if len(sys.argv) > 1 else data_path
+    raw_df = load_dataset(path)
+    fingerprint = dataset_fingerprint(raw_df)
+    df, quarantine = validate_dataset(raw_df)
+    print(build_snapshot(df, fingerprint, quarantine=quarantine))